@@ -28,34 +28,215 @@
 import streamlit as st
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from langchain_core.output_parsers import StrOutputParser
 from langchain_community.chat_message_histories import ChatMessageHistory
 from langchain_core.chat_history import BaseChatMessageHistory
+import google.generativeai as genai
+from google.api_core.exceptions import DeadlineExceeded, ResourceExhausted, ServiceUnavailable
+import asyncio
+import random
 import re
-import time
 
-# Validate the API key
-def valid_api(apikey):
+# Only these errors are worth retrying; auth failures and bad requests
+# fail the same way every time, so they should surface immediately
+TRANSIENT_ERRORS = (ResourceExhausted, ServiceUnavailable, DeadlineExceeded, TimeoutError)
+
+# Gemini API keys are long unpadded base64-ish tokens
+API_KEY_RE = re.compile(r'[A-Za-z0-9_\-]{30,}')
+
+# Validate the API key (cached so each key is probed at most once per session)
+@st.cache_data(show_spinner=False)
+def is_valid_api(apikey):
+    # Reject malformed keys without touching the network
+    if not API_KEY_RE.fullmatch(apikey):
+        return False
     try:
-        llm = ChatGoogleGenerativeAI(model="gemini-1.5-pro", api_key=apikey)
-        ans = llm.invoke("test input")
-        return True if ans else False
+        # Metadata endpoint: authenticates the key without a paid generation call
+        genai.configure(api_key=apikey)
+        return bool(list(genai.list_models())[:1])
     except Exception:
         return False
 
-# Retry mechanism for LLM invocation
-def invoke_with_retry(chain, session_id, query, testcase, retries=3, delay=2):
+# The prompt templates, built once at import; reruns only re-reference them.
+# The with-tests variant asks for a [TEST RESULTS] block; the code-only one
+# stops after [END CODE] so no output tokens are spent on an empty section.
+PROMPT_WITH_TESTS = PromptTemplate(
+    input_variables=["query", "testcases"],
+    template=(
+        """ You are a Python programming expert.
+                Generate clean, efficient, and well-documented Python code based on the user's requirements.
+
+                Requirements: {query}
+
+                Please follow these guidelines:
+                1. Write well-documented code with clear docstrings
+                2. Include appropriate error handling
+                3. Use type hints where relevant
+                4. Follow PEP 8 style guidelines
+                5. Handle edge cases
+
+                Test cases: {testcases}
+
+                Format your response exactly as follows:
+
+                [CODE]
+                <Write your Python code here>
+                [END CODE]
+
+                [TEST RESULTS]
+                <Show the test results here>
+                <If the provided test cases are invalid return Invalid testcase>
+                [END TEST RESULTS]
+
+                Important:
+                - Show for each test:
+                * Input: <actual input>
+                * Expected: <expected output>
+                * Result: <actual output>
+                * Status: PASS/FAIL
+                - Don't explain the code unless specifically asked
+                - Don't show multiple solutions unless requested
+                - Don't add any text outside the specified format
+            """
+    ),
+)
+
+PROMPT_CODE_ONLY = PromptTemplate(
+    input_variables=["query"],
+    template=(
+        """ You are a Python programming expert.
+                Generate clean, efficient, and well-documented Python code based on the user's requirements.
+
+                Requirements: {query}
+
+                Please follow these guidelines:
+                1. Write well-documented code with clear docstrings
+                2. Include appropriate error handling
+                3. Use type hints where relevant
+                4. Follow PEP 8 style guidelines
+                5. Handle edge cases
+
+                Format your response exactly as follows:
+
+                [CODE]
+                <Write your Python code here>
+                [END CODE]
+
+                Important:
+                - Don't explain the code unless specifically asked
+                - Don't show multiple solutions unless requested
+                - Don't add any text outside the specified format
+            """
+    ),
+)
+
+# Build the LLM client and chain once per API key; Streamlit reruns reuse them
+@st.cache_resource(show_spinner=False)
+def get_chain(api_key, with_tests=True):
+    llm = ChatGoogleGenerativeAI(model="gemini-1.5-pro", api_key=api_key)
+
+    # LCEL chain; unlike the deprecated LLMChain.run it supports
+    # astream/batch directly and skips the extra callback bookkeeping
+    prompt = PROMPT_WITH_TESTS if with_tests else PROMPT_CODE_ONLY
+    chain = prompt | llm | StrOutputParser()
+    return llm, chain
+
+# Retry mechanism for LLM invocation; streams tokens so the UI can fill in
+# while generation is still running instead of blocking on the full response
+async def invoke_with_retry(chain, input_data, placeholder=None, retries=3, delay=2):
     for attempt in range(retries):
         try:
-            input_data = {"query": query, "testcases": testcase}
-            response = chain.run(input_data)
-            return response
-        except Exception as e:
+            buffer = ""
+            async for chunk in chain.astream(input_data):
+                buffer += chunk
+                if placeholder is not None:
+                    # Flush only the [CODE] block as it arrives; once [END CODE]
+                    # shows up the block is complete and streaming updates stop
+                    start = buffer.find('[CODE]')
+                    if start != -1:
+                        end = buffer.find('[END CODE]', start + 6)
+                        stop = end if end != -1 else len(buffer)
+                        placeholder.code(buffer[start + 6:stop].strip(), language="python")
+            return buffer
+        except TRANSIENT_ERRORS:
             if attempt < retries - 1:
-                time.sleep(delay)  # Retry delay
+                # Exponential backoff with jitter, capped at 30s
+                await asyncio.sleep(min(30, delay * 2 ** attempt) + random.uniform(0, delay))
             else:
-                st.error(f"Agent failed after {retries} attempts: {e}")
-                return None
+                # Re-raise so st.cache_data never stores a failed result;
+                # the callers' except blocks render the error instead
+                raise
+
+# Response cache: repeat (query, testcase) pairs skip the Gemini call entirely
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def cached_invoke(api_key, query, testcase, _placeholder=None):
+    llm, chain = get_chain(api_key, with_tests=testcase is not None)
+    input_data = {"query": query}
+    if testcase is not None:
+        input_data["testcases"] = testcase
+    return asyncio.run(invoke_with_retry(
+        chain=chain,
+        input_data=input_data,
+        placeholder=_placeholder,
+    ))
+
+# Prompt for batch mode: every problem is answered in one round-trip, each
+# block fenced by numbered sentinels so the results can be split apart
+BATCH_TEMPLATE = (
+    """ You are a Python programming expert.
+        Generate clean, efficient, and well-documented Python code for each of the problems below.
+
+        {problems}
+
+        Please follow these guidelines:
+        1. Write well-documented code with clear docstrings
+        2. Include appropriate error handling
+        3. Use type hints where relevant
+        4. Follow PEP 8 style guidelines
+        5. Handle edge cases
+
+        Format your response exactly as follows, one block per problem:
+
+        [CODE 1]
+        <Write your Python code for problem 1 here>
+        [END CODE 1]
+        ...
+        [CODE {n}]
+        <Write your Python code for problem {n} here>
+        [END CODE {n}]
+
+        Important:
+        - Don't explain the code unless specifically asked
+        - Don't show multiple solutions unless requested
+        - Don't add any text outside the specified format
+    """
+)
+
+# Numbered sentinels are variable, so a compiled pattern beats str.find here
+BATCH_CODE_RE = re.compile(r'\[CODE (\d+)\](.*?)\[END CODE \1\]', re.DOTALL)
+
+# Function to extract every numbered code block from a batch response
+def extract_batch_codes(response: str):
+    """
+    Extract all numbered code blocks from a batch AI response.
+
+    Args:
+        response (str): Raw response from the AI
+
+    Returns:
+        list: (number, code) tuples in the order they appear
+    """
+    return [(int(m.group(1)), m.group(2).strip()) for m in BATCH_CODE_RE.finditer(response)]
+
+# Send several problems as one prompt so N queries cost one network round-trip
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def cached_batch_invoke(api_key, queries):
+    llm, chain = get_chain(api_key)
+    problems = "\n".join(f"Problem {i}: {q}" for i, q in enumerate(queries, 1))
+    return asyncio.run(invoke_with_retry(
+        chain=llm | StrOutputParser(),
+        input_data=BATCH_TEMPLATE.format(problems=problems, n=len(queries)),
+    ))
 
 #main function
 def main():
@@ -63,104 +244,76 @@ def main():
     st.title("Python Code Assistant")
     api_key = st.text_input("Enter your Gemini API key", type="password") # Your API key
 
-    if api_key:  # Only proceed when API key is entered
-        if valid_api(api_key):  # Check if the entered API key is valid
-            llm = ChatGoogleGenerativeAI(model="gemini-1.5-pro", api_key=api_key)
-
-            # the prompt template
-            prompt = PromptTemplate(
-                input_variables=["query", "testcases"],
-                template=(
-                    """ You are a Python programming expert. 
-                        Generate clean, efficient, and well-documented Python code based on the user's requirements.
-
-                        Requirements: {query}
-
-                        Please follow these guidelines:
-                        1. Write well-documented code with clear docstrings
-                        2. Include appropriate error handling
-                        3. Use type hints where relevant
-                        4. Follow PEP 8 style guidelines
-                        5. Handle edge cases
-
-                        {testcases}
-
-                        Format your response exactly as follows:
-
-                        [CODE]
-                        <Write your Python code here>
-                        [END CODE]
-
-                        [TEST RESULTS]
-                        <Show test results if {testcases} provided>
-                        <Return None if no {testcases} provided>
-                        <If {testcases} provided is invalid return Invalid testcase>
-                        [END TEST RESULTS]
-
-                        Important:
-                        - If test cases are provided, show for each test:
-                        * Input: <actual input>
-                        * Expected: <expected output>
-                        * Result: <actual output>
-                        * Status: PASS/FAIL
-                        - If no test cases are provided, only show the code section
-                        - Don't explain the code unless specifically asked
-                        - Don't show multiple solutions unless requested
-                        - Don't add any text outside the specified format
-                    """
-                ),
-            )
-
-            # LLM chain
-            chain = LLMChain(llm=llm, prompt=prompt)
+    if st.button("Reset"):  # Forget validated keys and force re-validation
+        st.session_state.pop("valid_keys", None)
+        # Also drop the cached probe results; without this a key once
+        # misclassified (e.g. during a network blip) would stay invalid
+        is_valid_api.clear()
 
+    if api_key:  # Only proceed when API key is entered
+        # Keys validated earlier this session skip even the cache lookup
+        valid_keys = st.session_state.setdefault("valid_keys", set())
+        key_hash = hash(api_key)
+        if key_hash in valid_keys or is_valid_api(api_key):  # Check if the entered API key is valid
+            valid_keys.add(key_hash)
             # Function to extract code blocks and test result from AI response
-            def extract_code_and_tests(response: str):
+            def extract_code_and_tests(response: str, has_tests: bool = True):
                 """
                 Extract both code and test results from the AI response.
-                
+
                 Args:
                     response (str): Raw response from the AI
-                    
+                    has_tests (bool): Whether a [TEST RESULTS] block was requested
+
                 Returns:
                     tuple: (code, test_results) where both are strings
                 """
-                # Extract code between [CODE] tags
-                code_match = re.search(r'\[CODE\](.*?)\[END CODE\]', response, re.DOTALL)
-                code = code_match.group(1).strip() if code_match else "No code found."
-                
-                # Extract test results between [TEST RESULTS] tags
-                test_match = re.search(r'\[TEST RESULTS\](.*?)\[END TEST RESULTS\]', response, re.DOTALL)
-                test_results = test_match.group(1).strip() if test_match else ""
-                
+                # Extract code between [CODE] tags with plain substring scans;
+                # the delimiters are fixed literals so no regex engine is needed
+                i = response.find('[CODE]')
+                j = response.find('[END CODE]', i + 6)
+                code = response[i + 6:j].strip() if i != -1 and j != -1 else "No code found."
+
+                # Extract test results between [TEST RESULTS] tags; the
+                # code-only prompt never emits them, so skip the scans
+                test_results = ""
+                if has_tests:
+                    i = response.find('[TEST RESULTS]')
+                    j = response.find('[END TEST RESULTS]', i + 14)
+                    test_results = response[i + 14:j].strip() if i != -1 and j != -1 else ""
+
                 return code, test_results
 
-            # Inputs
+            # Inputs; the form defers the rerun (and the LLM call) until the
+            # user explicitly submits instead of firing on every keystroke
             st.header("Enter Your Query")
-            user_input = st.text_input("Query", placeholder="e.g., Check if a string is a palindrome")
-            user_testcase = st.text_input("Testcases (Optional)", placeholder="Sample valid testcases")
+            with st.form("query_form"):
+                user_input = st.text_input("Query", placeholder="e.g., Check if a string is a palindrome")
+                user_testcase = st.text_input("Testcases (Optional)", placeholder="Sample valid testcases")
+                submitted = st.form_submit_button("Generate")
 
-            if user_input:
+            if submitted and user_input:
                 try:
-                    # Always provide a default value for `testcases`
-                    testcase_value = user_testcase if user_testcase else "No testcases provided"
-                    
-                    # Invoke chain and process response
-                    response = invoke_with_retry(
-                        chain=chain, 
-                        session_id="default_session", 
-                        query=user_input, 
-                        testcase=testcase_value
-                    )
+                    # No testcases means the code-only prompt: the whole
+                    # [TEST RESULTS] section is skipped, not just left empty
+                    testcase_value = user_testcase if user_testcase else None
+
+
+                    # Invoke chain and process response (cached per query/testcase);
+                    # the placeholder is filled token-by-token while streaming
+                    st.subheader("Generated Code:")
+                    code_box = st.empty()
+                    response = cached_invoke(api_key, user_input, testcase_value, _placeholder=code_box)
                     if response:
-                        code, test_results = extract_code_and_tests(response)
-                        
+                        code, test_results = extract_code_and_tests(
+                            response, has_tests=testcase_value is not None
+                        )
+
                         # Display the code
-                        st.subheader("Generated Code:")
-                        st.code(code, language="python", line_numbers=True)
-                        
+                        code_box.code(code, language="python", line_numbers=True)
+
                         # Display test results if they exist
-                        if test_results != 'None':
+                        if test_results and test_results != 'None':
                             st.subheader("Test Results:")
                             st.write(test_results)
                     else:
@@ -173,6 +326,26 @@ def main():
                     st.error(f"Error: Missing key in response - {e}")
                 except Exception as e:
                     st.error(f"Unexpected error: {str(e)}")
+
+            # Batch mode: several problems in a single API round-trip
+            st.header("Batch Mode (Optional)")
+            with st.form("batch_form"):
+                batch_input = st.text_area("Batch queries (one per line)", placeholder="One problem per line")
+                batch_submitted = st.form_submit_button("Generate Batch")
+
+            if batch_submitted and batch_input:
+                queries = tuple(q.strip() for q in batch_input.splitlines() if q.strip())
+                if queries:
+                    try:
+                        batch_response = cached_batch_invoke(api_key, queries)
+                        if batch_response:
+                            for number, code in extract_batch_codes(batch_response):
+                                st.subheader(f"Generated Code {number}:")
+                                st.code(code, language="python", line_numbers=True)
+                        else:
+                            st.error("Failed to process the batch.")
+                    except Exception as e:
+                        st.error(f"Unexpected error: {str(e)}")
         else:
              st.error("Invalid API Key. Please try again.")
     else: